@@ -13,6 +13,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from datetime import datetime
 from operator import itemgetter
 from typing import List, Optional
 
@@ -30,6 +31,8 @@ logger = get_logger(__name__)
 
 LATEST_DATASET_UPDATE_FILENAME_TAG = "LatestDatasetUpdateName"
 LATEST_DATASET_UPDATE_FILE_ETAG_TAG = "LatestDatasetUpdateETag"
+# distinguishes an uncached modification time from a dataset group without datasets
+_NOT_COMPUTED = object()
 
 
 class DatasetGroup(ForecastClient):
@@ -43,6 +46,7 @@ class DatasetGroup(ForecastClient):
     ):
         self._dataset_group_name = dataset_group_name
         self._dataset_group_domain = dataset_domain
+        self._latest_modification_time = _NOT_COMPUTED
 
         super().__init__(
             resource="dataset_group",
@@ -140,6 +144,7 @@ class DatasetGroup(ForecastClient):
             dataset.create()
 
         self.cli.update_dataset_group(DatasetGroupArn=self.arn, DatasetArns=arns)
+        self._latest_modification_time = _NOT_COMPUTED
         self.cli.tag_resource(
             ResourceArn=self.arn,
             Tags=[
@@ -217,11 +222,27 @@ class DatasetGroup(ForecastClient):
 
         return True
 
+    @property
+    def latest_modification_time(self) -> Optional[datetime]:
+        """
+        Get the most recent modification time of the datasets in this dataset group. This is cached on this instance
+        until the next call to update()
+        :return: The latest dataset modification time, or None if there are no datasets
+        """
+        if self._latest_modification_time is _NOT_COMPUTED:
+            self._latest_modification_time = max(
+                (dataset.get("LastModificationTime") for dataset in self.datasets),
+                default=None,
+            )
+        return self._latest_modification_time
+
     @property
     def latest_timestamp(self, format="%Y_%m_%d_%H_%M_%S"):
-        latest_dataset_modified = max(
-            [dataset.get("LastModificationTime") for dataset in self.datasets]
-        )
+        latest_dataset_modified = self.latest_modification_time
+        if latest_dataset_modified is None:
+            raise ValueError(
+                f"dataset group {self._dataset_group_name} has no datasets - cannot determine its latest timestamp"
+            )
         if format:
             return latest_dataset_modified.strftime(format)
         else:
@@ -11,9 +11,12 @@
 #  the specific language governing permissions and limitations under the License.                                     #
 # #####################################################################################################################
 
+from concurrent.futures import Future, ThreadPoolExecutor
+from heapq import nlargest
 from operator import itemgetter
 from os import environ
-from typing import Optional
+from time import monotonic
+from typing import Dict, Optional, Tuple
 
 from shared.Dataset.dataset_file import DatasetFile
 from shared.DatasetGroup.dataset_group import DatasetGroup
@@ -22,18 +25,67 @@ from shared.helpers import ForecastClient, UserTags
 from shared.logging import get_logger
 from shared.status import Status
 
+# PAGE_SIZE is the maximum page size supported by the Amazon Forecast list operations
+# DESCRIBE_TTL is the number of seconds a describe_forecast response is reused (override with FORECAST_DESCRIBE_TTL)
+PAGE_SIZE = 100
+DESCRIBE_TTL = 10
+MAX_WORKERS = 16
+# service status names to Status, resolved once rather than per lookup
+_STATUS_MAP = {status.name: status for status in Status}
 logger = get_logger(__name__)
 
+# declaring these global allows exports of many forecasts, and independent (I/O bound) service calls, to overlap.
+# status blocks on the dataset group read, so that read gets its own pool rather than queueing behind exports (or
+# deadlocking when status is called from an export running on the export pool)
+_export_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+_status_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+
+
+def forecast_export_job_arn(forecast_arn: str, export_name: str) -> str:
+    """
+    Build the ARN of a forecast export job from the ARN of its forecast
+    (arn:<partition>:forecast:<region>:<account>:forecast/<forecast name>)
+    :param forecast_arn: The ARN of the forecast
+    :param export_name: The name of the forecast export job
+    :return: The forecast export job ARN
+    """
+    *prefix, resource = forecast_arn.split(":", 5)
+    resource_type, _, forecast_name = resource.partition("/")
+    if (
+        len(prefix) != 5
+        or prefix[0] != "arn"
+        or prefix[2] != "forecast"
+        or resource_type != "forecast"
+        or not forecast_name
+    ):
+        raise ValueError(f"{forecast_arn} is not a valid forecast ARN")
+    return ":".join(prefix + [f"forecast-export-job/{forecast_name}/{export_name}"])
+
 
 class Export:
     """Used to hold the status of an Amazon Forecast forecast export"""
 
-    status = Status.DOES_NOT_EXIST
+    __slots__ = ("status",)
+
+    def __init__(self):
+        self.status = Status.DOES_NOT_EXIST
 
 
 class Forecast(ForecastClient):
     """Represents the desired state of a forecast generated by Amazon Forecast"""
 
+    __slots__ = (
+        "_predictor_arn",
+        "_dataset_group",
+        "_forecast_config",
+        "_history",
+        "_export_history",
+        "_describe_cache",
+        "_name_suffix",
+        "_forecast_params",
+        "_forecast_filters",
+    )
+
     def __init__(
         self,
         predictor_arn: str,
@@ -44,6 +96,22 @@ class Forecast(ForecastClient):
         self._predictor_arn = predictor_arn
         self._dataset_group = dataset_group
         self._forecast_config = forecast_config
+        self._history = {}
+        self._export_history = {}
+        self._describe_cache: Dict[str, Tuple[float, Dict]] = {}
+        self._name_suffix = None
+        self._forecast_filters = (
+            {
+                "Key": "DatasetGroupArn",
+                "Condition": "IS",
+                "Value": self._dataset_group.arn,
+            },
+            {
+                "Key": "PredictorArn",
+                "Condition": "IS",
+                "Value": self._predictor_arn,
+            },
+        )
 
         # Use these parameters only for validation.
         self._forecast_params = {
@@ -63,40 +131,86 @@ class Forecast(ForecastClient):
         Get the ARN of this resource
         :return: The ARN of this resource if it exists, otherwise None
         """
-        past_forecasts = self.history()
-        if not past_forecasts:
+        latest_forecast = self._latest_forecast()
+        if not latest_forecast:
             return None
 
-        return past_forecasts[0].get("ForecastArn")
+        return latest_forecast.get("ForecastArn")
 
-    def history(self):
+    def history(self, limit: Optional[int] = None, status: Status = None):
         """
-        Get this Forecast history from the Amazon Forecast Service.
+        Get this Forecast history from the Amazon Forecast Service. The history is cached on this instance until the
+        next call to create()
+        :param limit: The maximum number of (most recent) forecasts to return, or None to return all forecasts
+        :param status: The Status of the forecast(s) to return, or None to return all forecasts
         :return: List of past forecasts, in descending order by creation time
         """
-        past_forecasts = []
-        filters = [
-            {
-                "Key": "DatasetGroupArn",
-                "Condition": "IS",
-                "Value": self._dataset_group.arn,
-            },
-            {
-                "Key": "PredictorArn",
-                "Condition": "IS",
-                "Value": self._predictor_arn,
-            },
-        ]
+        key = itemgetter("LastModificationTime")
+        if limit is None:
+            return sorted(self._forecasts(status), key=key, reverse=True)
+        return nlargest(limit, self._forecasts(status), key=key)
 
-        paginator = self.cli.get_paginator("list_forecasts")
-        iterator = paginator.paginate(Filters=filters)
-        for page in iterator:
-            past_forecasts.extend(page.get("Forecasts", []))
+    def _latest_forecast(self) -> Optional[Dict]:
+        """
+        Get the most recently modified forecast without sorting the full history
+        :return: The most recent forecast summary if a forecast exists, otherwise None
+        """
+        return max(
+            self._forecasts(), key=itemgetter("LastModificationTime"), default=None
+        )
+
+    def _forecasts(self, status: Status = None):
+        """
+        Get (and cache until the next call to create()) all forecasts for this dataset group and predictor
+        :param status: The Status of the forecast(s) to return, or None to return all forecasts
+        :return: List of past forecasts, unordered
+        """
+        key = str(status) if status else None  # Status is not hashable
+        if key not in self._history:
+            self._history[key] = self._list_forecasts(status)
+        return self._history[key]
+
+    def _list_forecasts(self, status: Status = None):
+        """
+        List all forecasts for this dataset group and predictor. Amazon Forecast does not guarantee the order of the
+        results, so all pages are read (at the maximum page size). Status filtering is done by the service.
+        :param status: The Status of the forecast(s) to return, or None to return all forecasts
+        :return: List of past forecasts, unordered
+        """
+        filters = list(self._forecast_filters)
+        if status:
+            filters.append({"Condition": "IS", "Key": "Status", "Value": str(status)})
 
-        past_forecasts = sorted(
-            past_forecasts, key=itemgetter("LastModificationTime"), reverse=True
+        paginator = self.get_paginator("list_forecasts")
+        iterator = paginator.paginate(
+            Filters=filters, PaginationConfig={"PageSize": PAGE_SIZE}
         )
-        return past_forecasts
+        # results are ordered in Python - botocore parses timestamps to datetime, which JMESPath sort_by cannot order
+        return list(iterator.search("Forecasts || `[]`"))
+
+    def invalidate(self):
+        """
+        Drop any cached forecast, export and describe information held by this instance
+        :return: None
+        """
+        self._history = {}
+        self._export_history = {}
+        self._describe_cache = {}
+
+    def _describe_forecast(self, forecast_arn: str) -> Dict:
+        """
+        Describe a forecast, reusing a recent response for the same ARN if one is available
+        :param forecast_arn: The ARN of the forecast to describe
+        :return: The describe_forecast response
+        """
+        ttl = float(environ.get("FORECAST_DESCRIBE_TTL", DESCRIBE_TTL))
+        cached = self._describe_cache.get(forecast_arn)
+        if cached and monotonic() - cached[0] < ttl:
+            return cached[1]
+
+        response = self.cli.describe_forecast(ForecastArn=forecast_arn)
+        self._describe_cache[forecast_arn] = (monotonic(), response)
+        return response
 
     @property
     def status(self) -> Status:
@@ -105,35 +219,50 @@ class Forecast(ForecastClient):
         format does not yet exist.
         :return: Status
         """
-        past_forecasts = self.history()
+        latest_forecast = self._latest_forecast()
 
         # check if a forecast has been created:
-        if not past_forecasts:
+        if not latest_forecast:
             logger.debug("No past forecasts found")
             return Status.DOES_NOT_EXIST
 
-        past_status = self.cli.describe_forecast(
-            ForecastArn=past_forecasts[0].get("ForecastArn")
-        )
+        # the forecast summary carries the predictor ARN - only describe the forecast to check it if it is missing
+        forecast_arn = latest_forecast.get("ForecastArn")
+        past_status = None
+        predictor_arn = latest_forecast.get("PredictorArn")
+        if not predictor_arn:
+            past_status = self._describe_forecast(forecast_arn)
+            predictor_arn = past_status.get("PredictorArn")
 
         # if the past forecast was generated with a different predictor, regenerate
-        if past_status.get("PredictorArn") != self._predictor_arn:
+        if predictor_arn != self._predictor_arn:
             logger.debug(
                 "Most recent forecast was generated with a different predictor, a new forecast should be created"
             )
             return Status.DOES_NOT_EXIST
 
+        # the dataset group modification time does not depend on the forecast - describe both concurrently
+        datasets_modified = _status_executor.submit(
+            lambda: self._dataset_group.latest_modification_time
+        )
+        if not past_status:
+            try:
+                past_status = self._describe_forecast(forecast_arn)
+            except Exception:
+                datasets_modified.cancel()  # work already in flight cannot be cancelled
+                raise
+
         # if the datasets in the datasetgroup have changed after the previous forecast
         # was generated, regenerate the forecast.
-        for dataset in self._dataset_group.datasets:
-            if dataset.get("LastModificationTime") > past_status.get("CreationTime"):
-                logger.debug(
-                    "Datasets have changed since last forecast generation, a new forecast should be created "
-                )
-                return Status.DOES_NOT_EXIST
+        last_modified = datasets_modified.result()
+        if last_modified and last_modified > past_status.get("CreationTime"):
+            logger.debug(
+                "Datasets have changed since last forecast generation, a new forecast should be created "
+            )
+            return Status.DOES_NOT_EXIST
 
-        self.set_user_tags(resource_arn=past_forecasts[0].get("ForecastArn"))
-        return Status[past_status.get("Status")]
+        self.set_user_tags(resource_arn=forecast_arn)
+        return _STATUS_MAP.get(past_status.get("Status"), Status.DOES_NOT_EXIST)
 
     @property
     def _latest_timestamp(self):
@@ -143,18 +272,36 @@ class Forecast(ForecastClient):
         """
         return self._dataset_group.latest_timestamp
 
+    @property
+    def _resource_name_suffix(self) -> str:
+        """
+        The forecast and forecast export names share a suffix that requires several service calls to determine. It does
+        not change for the life of this instance, so it is only determined once.
+        :return: the name suffix
+        """
+        if self._name_suffix is None:
+            prefix = "ap_" if self.uses_auto_predictor() else ""
+            self._name_suffix = f"{prefix}{self._dataset_group.dataset_group_name}_{self._latest_timestamp}"
+        return self._name_suffix
+
+    @property
+    def _forecast_name(self) -> str:
+        return f"forecast_{self._resource_name_suffix}"
+
+    @property
+    def _export_name(self) -> str:
+        return f"export_{self._resource_name_suffix}"
+
     def create(self):
         """
         Create the forecast
         :return: None
         """
-        if self.uses_auto_predictor():
-            forecast_name = f"forecast_ap_{self._dataset_group.dataset_group_name}_{self._latest_timestamp}"
-        else:
-            forecast_name = f"forecast_{self._dataset_group.dataset_group_name}_{self._latest_timestamp}"
+        forecast_name = self._forecast_name
 
+        self.invalidate()
         try:
-            logger.info("Creating forecast %s" % forecast_name)
+            logger.info("Creating forecast %s", forecast_name)
             self.cli.create_forecast(
                 ForecastName=forecast_name,
                 PredictorArn=self._predictor_arn,
@@ -162,17 +309,20 @@ class Forecast(ForecastClient):
                 **self._forecast_config,
             )
         except self.cli.exceptions.ResourceAlreadyExistsException:
-            logger.debug("Forecast %s is already creating" % forecast_name)
+            logger.debug("Forecast %s is already creating", forecast_name)
         except self.cli.exceptions.ResourceInUseException as excinfo:
-            logger.debug("Forecast %s is updating: %s" % (forecast_name, str(excinfo)))
+            logger.debug("Forecast %s is updating: %s", forecast_name, excinfo)
 
     def export_history(self, status="ACTIVE"):
         """
-        Get this Predictor history from the Amazon Forecast service.
-        :param status: The Status of the predictor(s) to return
-        :return: List of past predictors, in descending order by creation time
+        Get this Forecast export history from the Amazon Forecast service. The history is cached on this instance (by
+        status) until the next call to create() or export()
+        :param status: The Status of the export(s) to return
+        :return: List of past exports, in descending order by creation time
         """
-        past_exports = []
+        if status in self._export_history:
+            return self._export_history[status]
+
         filters = [
             {
                 "Condition": "IS",
@@ -182,16 +332,18 @@ class Forecast(ForecastClient):
             {"Condition": "IS", "Key": "Status", "Value": status},
         ]
 
-        paginator = self.cli.get_paginator("list_forecast_export_jobs")
-        iterator = paginator.paginate(Filters=filters)
-        for page in iterator:
-            past_exports.extend(page.get("ForecastExportJobs", []))
-
+        paginator = self.get_paginator("list_forecast_export_jobs")
+        iterator = paginator.paginate(
+            Filters=filters, PaginationConfig={"PageSize": PAGE_SIZE}
+        )
         past_exports = sorted(
-            past_exports, key=itemgetter("CreationTime"), reverse=True
+            iterator.search("ForecastExportJobs || `[]`"),
+            key=itemgetter("CreationTime"),
+            reverse=True,
         )
-        logger.debug("there are {%d} exports: %s" % (len(past_exports), past_exports))
+        logger.debug("there are {%d} exports: %s", len(past_exports), past_exports)
 
+        self._export_history[status] = past_exports
         return past_exports
 
     def export(self, dataset_file: DatasetFile) -> Export:
@@ -200,31 +352,27 @@ class Forecast(ForecastClient):
         :param dataset_file: The dataset file last updated that generated this export
         :return: Status
         """
-        if not self.arn:
+        forecast_arn = self.arn
+        if not forecast_arn:
             raise ValueError("Forecast does not yet exist - cannot perform export.")
 
-        if self.uses_auto_predictor():
-            export_name = f"export_ap_{self._dataset_group.dataset_group_name}_{self._latest_timestamp}"
-        else:
-            export_name = f"export_{self._dataset_group.dataset_group_name}_{self._latest_timestamp}"
-        export_arn = (
-            self.arn.replace(":forecast/", ":forecast-export-job/") + f"/{export_name}"
-        )
+        export_name = self._export_name
+        export_arn = forecast_export_job_arn(forecast_arn, export_name)
 
         past_export = Export()
         try:
             past_status = self.cli.describe_forecast_export_job(
                 ForecastExportJobArn=export_arn
             )
-            past_export.status = Status[past_status.get("Status")]
-        except self.cli.exceptions.ResourceInUseException as excinfo:
-            logger.debug(
-                "Forecast export %s is updating: %s" % (export_name, str(excinfo))
+            past_export.status = _STATUS_MAP.get(
+                past_status.get("Status"), Status.DOES_NOT_EXIST
             )
+        except self.cli.exceptions.ResourceInUseException as excinfo:
+            logger.debug("Forecast export %s is updating: %s", export_name, excinfo)
         except self.cli.exceptions.ResourceNotFoundException:
-            logger.info("Creating forecast export %s" % export_name)
+            logger.info("Creating forecast export %s", export_name)
             self.cli.create_forecast_export_job(
-                ForecastArn=self.arn,
+                ForecastArn=forecast_arn,
                 ForecastExportJobName=export_name,
                 Destination={
                     "S3Config": {
@@ -234,13 +382,21 @@ class Forecast(ForecastClient):
                 },
             )
             past_export.status = Status.CREATE_PENDING
+            self._export_history = {}
 
-        logger.debug(
-            "Export status for %s is %s" % (export_name, str(past_export.status))
-        )
+        logger.debug("Export status for %s is %s", export_name, past_export.status)
         self.set_user_tags(resource_arn=export_arn)
         return past_export
 
+    def export_async(self, dataset_file: DatasetFile) -> Future:
+        """
+        Export/ check on an export of this Forecast without blocking. Use this to overlap the service calls made when
+        exporting many forecasts, collecting the results with concurrent.futures.as_completed
+        :param dataset_file: The dataset file last updated that generated this export
+        :return: Future resolving to the Export
+        """
+        return _export_executor.submit(self.export, dataset_file)
+
     def uses_auto_predictor(self):
         try:
             self.cli.describe_predictor(PredictorArn=self._predictor_arn)
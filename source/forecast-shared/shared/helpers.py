@@ -27,12 +27,17 @@ logger = get_logger(__name__)
 SOLUTION_ID = "SO0123"
 SOLUTION_VERSION = "1.3.3"
 CLIENT_CONFIG = Config(
-    retries={"max_attempts": 10, "mode": "standard"},
+    retries={"max_attempts": 10, "mode": "adaptive"},
+    max_pool_connections=64,  # at least as wide as any thread pool sharing a client
+    connect_timeout=3,
+    read_timeout=30,
     user_agent_extra=f"AwsSolution/{SOLUTION_ID}/{SOLUTION_VERSION}",
 )
 
 # declaring these global makes initialization/ performance a bit better if generating many forecasts
 _helpers_service_clients = dict()
+_helpers_paginators = dict()
+_helpers_account_id = None
 
 
 class ResourcePending(Exception):
@@ -141,11 +146,14 @@ def get_sfn_client():
 
 def get_aws_account_id():
     """
-    Get the caller's AWS account ID
+    Get the caller's AWS account ID. This is resolved once (using STS) and then reused.
     :return: The AWS account ID
     """
-    sts_client = get_sts_client()
-    return sts_client.get_caller_identity().get("Account")
+    global _helpers_account_id
+    if not _helpers_account_id:
+        sts_client = get_sts_client()
+        _helpers_account_id = sts_client.get_caller_identity().get("Account")
+    return _helpers_account_id
 
 
 def get_aws_region():
@@ -217,14 +225,15 @@ class UserTags:
 class ForecastClient:
     """Validate a resource from Amazon Forecast against its resource model"""
 
+    __slots__ = ("account_id", "region", "_cli", "resource", "validator", "user_tags")
     _tags = {}
 
     def __init__(
         self, resource, user_tags: Optional[UserTags] = None, **resource_creation_kwargs
     ):
+        self._cli = None
         self.account_id = get_aws_account_id()
         self.region = get_aws_region()
-        self.cli = get_forecast_client()
         self.resource = resource
         self.validator = InputValidator(
             f"create_{self.resource}", **resource_creation_kwargs
@@ -232,6 +241,33 @@ class ForecastClient:
         self.add_tag("SolutionId", SOLUTION_ID)
         self.user_tags = user_tags or UserTags()
 
+    @property
+    def cli(self):
+        """
+        Get the Amazon Forecast boto3 client for this resource. The (global) client is only resolved on first use.
+        :return: the Amazon Forecast boto3 client
+        """
+        if self._cli is None:
+            self._cli = get_forecast_client()
+        return self._cli
+
+    @cli.setter
+    def cli(self, cli):
+        self._cli = cli
+
+    def get_paginator(self, operation_name: str):
+        """
+        Get a paginator for an operation of this resource's client. Paginators are stateless, so they are created once
+        per client and operation and then reused.
+        :param operation_name: The operation to paginate (e.g. list_forecasts)
+        :return: The paginator
+        """
+        global _helpers_paginators
+        key = (self.cli, operation_name)
+        if key not in _helpers_paginators:
+            _helpers_paginators[key] = self.cli.get_paginator(operation_name)
+        return _helpers_paginators[key]
+
     def add_tag(self, name: str, value: str):
         """
         Add a tag to the list of solution-specific tags that this resource should have
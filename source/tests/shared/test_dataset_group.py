@@ -198,6 +198,29 @@ def test_latest_timestamp(mocked_dsg):
     assert result == "2002_01_01_00_00_00"
 
 
+def test_latest_modification_time_cached(mocked_dsg):
+    dates = [datetime(2002, 1, 1), datetime(2000, 1, 1), datetime(2001, 1, 1)]
+
+    def side_effect(DatasetArn):
+        return {"LastModificationTime": dates.pop()}
+
+    mocked_dsg.cli.describe_dataset.side_effect = side_effect
+    assert mocked_dsg.latest_modification_time == datetime(2002, 1, 1)
+    assert mocked_dsg.latest_timestamp == "2002_01_01_00_00_00"
+    assert mocked_dsg.cli.describe_dataset_group.call_count == 1
+
+
+def test_latest_modification_time_no_datasets(mocked_dsg):
+    mocked_dsg.cli.describe_dataset_group.return_value = {"DatasetArns": []}
+
+    assert mocked_dsg.latest_modification_time is None
+    assert mocked_dsg.latest_modification_time is None
+    assert mocked_dsg.cli.describe_dataset_group.call_count == 1
+
+    with pytest.raises(ValueError):
+        mocked_dsg.latest_timestamp
+
+
 @mock_sts
 @mock_forecast
 def test_dataset_group_create(caplog):
@@ -12,6 +12,7 @@
 # #####################################################################################################################
 
 from datetime import datetime
+from threading import Event, Thread
 
 import boto3
 import pytest
@@ -19,7 +20,13 @@ from botocore.stub import Stubber
 from moto import mock_sts
 
 from shared.Dataset.dataset_file import DatasetFile
-from shared.Forecast.forecast import Export
+from shared.Forecast.forecast import (
+    Export,
+    Forecast,
+    MAX_WORKERS,
+    _export_executor,
+    forecast_export_job_arn,
+)
 from shared.config import Config
 from shared.status import Status
 
@@ -35,6 +42,38 @@ def test_default_export_status():
     assert Export().status == Status.DOES_NOT_EXIST
 
 
+@pytest.mark.parametrize(
+    "forecast_arn,export_arn",
+    [
+        (
+            "arn:aws:forecast:us-east-1:abcdefghijkl:forecast/forecast_1",
+            "arn:aws:forecast:us-east-1:abcdefghijkl:forecast-export-job/forecast_1/export_1",
+        ),
+        (
+            "arn:aws-cn:forecast:cn-north-1:abcdefghijkl:forecast/forecast_1",
+            "arn:aws-cn:forecast:cn-north-1:abcdefghijkl:forecast-export-job/forecast_1/export_1",
+        ),
+    ],
+)
+def test_forecast_export_job_arn(forecast_arn, export_arn):
+    assert forecast_export_job_arn(forecast_arn, "export_1") == export_arn
+
+
+@pytest.mark.parametrize(
+    "forecast_arn",
+    [
+        "arn:2015-1-1",
+        "arn:aws:forecast:us-east-1:abcdefghijkl:predictor/predictor_1",
+        "foo:aws:forecast:us-east-1:abcdefghijkl:forecast/forecast_1",
+        "arn:aws:s3:us-east-1:abcdefghijkl:forecast/forecast_1",
+        "arn:aws:forecast:us-east-1:abcdefghijkl:forecast/",
+    ],
+)
+def test_forecast_export_job_arn_invalid(forecast_arn):
+    with pytest.raises(ValueError):
+        forecast_export_job_arn(forecast_arn, "export_1")
+
+
 @mock_sts
 def test_init_forecast(forecast_stub, configuration_data):
     config = Config()
@@ -115,6 +154,10 @@ def test_forecast_history(forecast_stub, configuration_data):
     assert history[0].get("LastModificationTime") == datetime(2017, 1, 1)
     assert history[1].get("LastModificationTime") == datetime(2015, 1, 1)
 
+    latest = forecast.history(limit=1)
+    assert len(latest) == 1
+    assert latest[0].get("LastModificationTime") == datetime(2017, 1, 1)
+
 
 @mock_sts
 def test_status_not_yet_created(forecast_stub, configuration_data):
@@ -131,3 +174,502 @@ def test_status_not_yet_created(forecast_stub, configuration_data):
 
     assert forecast.status == Status.DOES_NOT_EXIST
     forecast_stub.assert_no_pending_responses()
+
+
+@mock_sts
+def test_forecast_history_cached(forecast_stub, configuration_data):
+    config = Config()
+    config.config = configuration_data
+
+    dataset_file = DatasetFile("RetailDemandTNPTS.csv", "some_bucket")
+    forecast = config.forecast(
+        dataset_file, "RetailDemandTNPTS", predictor_arn="arn:2015-1-1"
+    )
+
+    forecast.cli = forecast_stub.client
+    forecast_stub.add_response(
+        "list_forecasts",
+        {
+            "Forecasts": [
+                {
+                    "LastModificationTime": datetime(2017, 1, 1),
+                    "ForecastArn": "arn:2017-1-1",
+                },
+            ]
+        },
+    )
+
+    # only one list_forecasts response is stubbed - repeated reads must use the cache
+    assert forecast.arn == "arn:2017-1-1"
+    assert forecast.arn == "arn:2017-1-1"
+    assert len(forecast.history()) == 1
+    forecast_stub.assert_no_pending_responses()
+
+
+@mock_sts
+def test_forecast_describe_cached(forecast_stub, configuration_data, monkeypatch):
+    config = Config()
+    config.config = configuration_data
+
+    dataset_file = DatasetFile("RetailDemandTNPTS.csv", "some_bucket")
+    forecast = config.forecast(
+        dataset_file, "RetailDemandTNPTS", predictor_arn="arn:2015-1-1"
+    )
+
+    forecast.cli = forecast_stub.client
+    forecast_arn = "arn:aws:forecast:us-east-1:abcdefghijkl:forecast/forecast_2017"
+    forecast_stub.add_response(
+        "describe_forecast", {"ForecastArn": forecast_arn, "Status": "ACTIVE"}
+    )
+    forecast_stub.add_response(
+        "describe_forecast", {"ForecastArn": forecast_arn, "Status": "ACTIVE"}
+    )
+
+    # a response within the TTL is reused
+    assert forecast._describe_forecast(forecast_arn).get("Status") == "ACTIVE"
+    assert forecast._describe_forecast(forecast_arn).get("Status") == "ACTIVE"
+
+    # invalidation forces the next describe
+    forecast.invalidate()
+    assert forecast._describe_forecast(forecast_arn).get("Status") == "ACTIVE"
+    forecast_stub.assert_no_pending_responses()
+
+    # a TTL of zero disables the cache
+    monkeypatch.setenv("FORECAST_DESCRIBE_TTL", "0")
+    forecast_stub.add_response(
+        "describe_forecast", {"ForecastArn": forecast_arn, "Status": "ACTIVE"}
+    )
+    assert forecast._describe_forecast(forecast_arn).get("Status") == "ACTIVE"
+    forecast_stub.assert_no_pending_responses()
+
+
+@mock_sts
+def test_forecast_export_history(forecast_stub, configuration_data):
+    config = Config()
+    config.config = configuration_data
+
+    dataset_file = DatasetFile("RetailDemandTNPTS.csv", "some_bucket")
+    forecast = config.forecast(
+        dataset_file, "RetailDemandTNPTS", predictor_arn="arn:2015-1-1"
+    )
+
+    forecast.cli = forecast_stub.client
+    forecast_stub.add_response(
+        "list_forecasts",
+        {
+            "Forecasts": [
+                {
+                    "LastModificationTime": datetime(2017, 1, 1),
+                    "ForecastArn": "arn:2017-1-1",
+                },
+            ]
+        },
+    )
+    forecast_stub.add_response(
+        "list_forecast_export_jobs",
+        {
+            "ForecastExportJobs": [
+                {
+                    "CreationTime": datetime(2015, 1, 1),
+                    "ForecastExportJobArn": "arn:export-2015-1-1",
+                },
+                {
+                    "CreationTime": datetime(2017, 1, 1),
+                    "ForecastExportJobArn": "arn:export-2017-1-1",
+                },
+            ]
+        },
+    )
+
+    history = forecast.export_history()
+    assert history[0].get("ForecastExportJobArn") == "arn:export-2017-1-1"
+    assert history[1].get("ForecastExportJobArn") == "arn:export-2015-1-1"
+    assert forecast.export_history() == history
+    forecast_stub.assert_no_pending_responses()
+
+
+@mock_sts
+def test_forecast_export_async(configuration_data, mocker):
+    config = Config()
+    config.config = configuration_data
+
+    dataset_file = DatasetFile("RetailDemandTNPTS.csv", "some_bucket")
+    forecast = config.forecast(
+        dataset_file, "RetailDemandTNPTS", predictor_arn="arn:2015-1-1"
+    )
+
+    export = Export()
+    mocker.patch.object(Forecast, "export", return_value=export)
+
+    assert forecast.export_async(dataset_file).result() is export
+    forecast.export.assert_called_once_with(dataset_file)
+
+
+@mock_sts
+def test_forecast_names(configuration_data, mocker):
+    config = Config()
+    config.config = configuration_data
+
+    dataset_file = DatasetFile("RetailDemandTNPTS.csv", "some_bucket")
+    forecast = config.forecast(
+        dataset_file, "RetailDemandTNPTS", predictor_arn="arn:2015-1-1"
+    )
+
+    mocker.patch.object(Forecast, "uses_auto_predictor", return_value=True)
+    mocker.patch.object(
+        Forecast,
+        "_latest_timestamp",
+        new_callable=mocker.PropertyMock,
+        return_value="2015_01_01_00_00_00",
+    )
+
+    assert (
+        forecast._forecast_name == "forecast_ap_RetailDemandTNPTS_2015_01_01_00_00_00"
+    )
+    assert forecast._export_name == "export_ap_RetailDemandTNPTS_2015_01_01_00_00_00"
+    forecast.uses_auto_predictor.assert_called_once()
+
+
+@mock_sts
+def test_forecast_history_status_filters(forecast_stub, configuration_data):
+    config = Config()
+    config.config = configuration_data
+
+    dataset_file = DatasetFile("RetailDemandTNPTS.csv", "some_bucket")
+    forecast = config.forecast(
+        dataset_file, "RetailDemandTNPTS", predictor_arn="arn:2015-1-1"
+    )
+
+    forecast.cli = forecast_stub.client
+    base_filters = [
+        {
+            "Key": "DatasetGroupArn",
+            "Condition": "IS",
+            "Value": forecast._dataset_group.arn,
+        },
+        {"Key": "PredictorArn", "Condition": "IS", "Value": "arn:2015-1-1"},
+    ]
+    forecast_stub.add_response(
+        "list_forecasts",
+        {"Forecasts": []},
+        {
+            "Filters": base_filters,
+            "MaxResults": 100,
+        },
+    )
+    forecast_stub.add_response(
+        "list_forecasts",
+        {"Forecasts": []},
+        {
+            "Filters": base_filters
+            + [{"Condition": "IS", "Key": "Status", "Value": "ACTIVE"}],
+            "MaxResults": 100,
+        },
+    )
+
+    assert forecast.history() == []
+    assert forecast.history(status=Status.ACTIVE) == []
+    forecast_stub.assert_no_pending_responses()
+
+
+@mock_sts
+@pytest.mark.parametrize(
+    "service_status,status",
+    [("ACTIVE", Status.ACTIVE), ("CREATE_STOPPED", Status.DOES_NOT_EXIST)],
+)
+def test_forecast_export_status(
+    forecast_stub, configuration_data, mocker, service_status, status
+):
+    config = Config()
+    config.config = configuration_data
+
+    dataset_file = DatasetFile("RetailDemandTNPTS.csv", "some_bucket")
+    forecast = config.forecast(
+        dataset_file, "RetailDemandTNPTS", predictor_arn="arn:2015-1-1"
+    )
+
+    forecast.cli = forecast_stub.client
+    mocker.patch.object(
+        Forecast,
+        "arn",
+        new_callable=mocker.PropertyMock,
+        return_value="arn:aws:forecast:us-east-1:abcdefghijkl:forecast/forecast_1",
+    )
+    mocker.patch.object(
+        Forecast,
+        "_export_name",
+        new_callable=mocker.PropertyMock,
+        return_value="export_1",
+    )
+    mocker.patch.object(Forecast, "set_user_tags")
+    forecast_stub.add_response(
+        "describe_forecast_export_job",
+        {"Status": service_status},
+        {
+            "ForecastExportJobArn": "arn:aws:forecast:us-east-1:abcdefghijkl:forecast-export-job/forecast_1/export_1"
+        },
+    )
+
+    assert forecast.export(dataset_file).status == status
+    forecast_stub.assert_no_pending_responses()
+
+
+@mock_sts
+@pytest.mark.parametrize(
+    "dataset_modified,status",
+    [
+        (datetime(2016, 1, 1), Status.ACTIVE),
+        (datetime(2018, 1, 1), Status.DOES_NOT_EXIST),
+    ],
+)
+def test_forecast_status(
+    forecast_stub, configuration_data, mocker, dataset_modified, status
+):
+    config = Config()
+    config.config = configuration_data
+
+    dataset_file = DatasetFile("RetailDemandTNPTS.csv", "some_bucket")
+    forecast = config.forecast(
+        dataset_file, "RetailDemandTNPTS", predictor_arn="arn:2015-1-1"
+    )
+
+    forecast.cli = forecast_stub.client
+    forecast._dataset_group.cli = mocker.MagicMock()
+    forecast._dataset_group.cli.describe_dataset_group.return_value = {
+        "DatasetArns": ["arn::1"]
+    }
+    forecast._dataset_group.cli.describe_dataset.return_value = {
+        "LastModificationTime": dataset_modified
+    }
+    mocker.patch.object(Forecast, "set_user_tags")
+
+    forecast_stub.add_response(
+        "list_forecasts",
+        {
+            "Forecasts": [
+                {
+                    "LastModificationTime": datetime(2017, 1, 1),
+                    "ForecastArn": "arn:2017-1-1",
+                    "PredictorArn": "arn:2015-1-1",
+                },
+            ]
+        },
+    )
+    forecast_stub.add_response(
+        "describe_forecast",
+        {
+            "ForecastArn": "arn:2017-1-1",
+            "PredictorArn": "arn:2015-1-1",
+            "CreationTime": datetime(2017, 1, 1),
+            "Status": "ACTIVE",
+        },
+        {"ForecastArn": "arn:2017-1-1"},
+    )
+
+    assert forecast.status == status
+    forecast_stub.assert_no_pending_responses()
+
+
+@mock_sts
+def test_forecast_history_empty_page(forecast_stub, configuration_data):
+    config = Config()
+    config.config = configuration_data
+
+    dataset_file = DatasetFile("RetailDemandTNPTS.csv", "some_bucket")
+    forecast = config.forecast(
+        dataset_file, "RetailDemandTNPTS", predictor_arn="arn:2015-1-1"
+    )
+
+    forecast.cli = forecast_stub.client
+    forecast_stub.add_response("list_forecasts", {})
+
+    # pages without a Forecasts key are treated as empty
+    assert forecast.arn is None
+    assert forecast.history() == []
+    assert forecast.history(limit=1) == []
+    assert forecast.status == Status.DOES_NOT_EXIST
+    forecast_stub.assert_no_pending_responses()
+
+
+@mock_sts
+def test_forecast_export_history_empty_page(forecast_stub, configuration_data):
+    config = Config()
+    config.config = configuration_data
+
+    dataset_file = DatasetFile("RetailDemandTNPTS.csv", "some_bucket")
+    forecast = config.forecast(
+        dataset_file, "RetailDemandTNPTS", predictor_arn="arn:2015-1-1"
+    )
+
+    forecast.cli = forecast_stub.client
+    forecast_stub.add_response(
+        "list_forecasts",
+        {
+            "Forecasts": [
+                {
+                    "LastModificationTime": datetime(2017, 1, 1),
+                    "ForecastArn": "arn:2017-1-1",
+                },
+            ]
+        },
+    )
+    forecast_stub.add_response("list_forecast_export_jobs", {})
+
+    assert forecast.export_history() == []
+    forecast_stub.assert_no_pending_responses()
+
+
+@mock_sts
+@pytest.mark.parametrize("summary_has_predictor", [True, False])
+def test_forecast_status_different_predictor(
+    forecast_stub, configuration_data, mocker, summary_has_predictor
+):
+    config = Config()
+    config.config = configuration_data
+
+    dataset_file = DatasetFile("RetailDemandTNPTS.csv", "some_bucket")
+    forecast = config.forecast(
+        dataset_file, "RetailDemandTNPTS", predictor_arn="arn:2015-1-1"
+    )
+
+    forecast.cli = forecast_stub.client
+    forecast._dataset_group.cli = mocker.MagicMock()
+
+    summary = {
+        "LastModificationTime": datetime(2017, 1, 1),
+        "ForecastArn": "arn:2017-1-1",
+    }
+    if summary_has_predictor:
+        summary["PredictorArn"] = "arn:2016-1-1"
+    forecast_stub.add_response("list_forecasts", {"Forecasts": [summary]})
+    if not summary_has_predictor:
+        forecast_stub.add_response(
+            "describe_forecast",
+            {"ForecastArn": "arn:2017-1-1", "PredictorArn": "arn:2016-1-1"},
+            {"ForecastArn": "arn:2017-1-1"},
+        )
+
+    assert forecast.status == Status.DOES_NOT_EXIST
+    forecast_stub.assert_no_pending_responses()
+
+    # the dataset group should not be read when the predictor has changed
+    assert not forecast._dataset_group.cli.method_calls
+
+
+@mock_sts
+@pytest.mark.parametrize(
+    "service_status,status",
+    [
+        ("DELETE_PENDING", Status.DELETE_PENDING),
+        ("DELETE_IN_PROGRESS", Status.DELETE_IN_PROGRESS),
+    ],
+)
+def test_forecast_status_deleting(
+    forecast_stub, configuration_data, mocker, service_status, status
+):
+    config = Config()
+    config.config = configuration_data
+
+    dataset_file = DatasetFile("RetailDemandTNPTS.csv", "some_bucket")
+    forecast = config.forecast(
+        dataset_file, "RetailDemandTNPTS", predictor_arn="arn:2015-1-1"
+    )
+
+    forecast.cli = forecast_stub.client
+    forecast._dataset_group.cli = mocker.MagicMock()
+    forecast._dataset_group.cli.describe_dataset_group.return_value = {
+        "DatasetArns": ["arn::1"]
+    }
+    forecast._dataset_group.cli.describe_dataset.return_value = {
+        "LastModificationTime": datetime(2016, 1, 1)
+    }
+    mocker.patch.object(Forecast, "set_user_tags")
+
+    # a forecast being deleted is still the latest forecast - its status is reported so the workflow waits
+    forecast_stub.add_response(
+        "list_forecasts",
+        {
+            "Forecasts": [
+                {
+                    "LastModificationTime": datetime(2017, 1, 1),
+                    "ForecastArn": "arn:2017-1-1",
+                    "PredictorArn": "arn:2015-1-1",
+                    "Status": service_status,
+                },
+            ]
+        },
+        {"Filters": list(forecast._forecast_filters), "MaxResults": 100},
+    )
+    forecast_stub.add_response(
+        "describe_forecast",
+        {
+            "ForecastArn": "arn:2017-1-1",
+            "PredictorArn": "arn:2015-1-1",
+            "CreationTime": datetime(2017, 1, 1),
+            "Status": service_status,
+        },
+        {"ForecastArn": "arn:2017-1-1"},
+    )
+
+    assert forecast.status == status
+    assert forecast.status.updating
+    forecast_stub.assert_no_pending_responses()
+
+
+@mock_sts
+def test_forecast_status_export_pool_saturated(
+    forecast_stub, configuration_data, mocker
+):
+    config = Config()
+    config.config = configuration_data
+
+    dataset_file = DatasetFile("RetailDemandTNPTS.csv", "some_bucket")
+    forecast = config.forecast(
+        dataset_file, "RetailDemandTNPTS", predictor_arn="arn:2015-1-1"
+    )
+
+    forecast.cli = forecast_stub.client
+    forecast._dataset_group.cli = mocker.MagicMock()
+    forecast._dataset_group.cli.describe_dataset_group.return_value = {
+        "DatasetArns": ["arn::1"]
+    }
+    forecast._dataset_group.cli.describe_dataset.return_value = {
+        "LastModificationTime": datetime(2016, 1, 1)
+    }
+    mocker.patch.object(Forecast, "set_user_tags")
+    forecast_stub.add_response(
+        "list_forecasts",
+        {
+            "Forecasts": [
+                {
+                    "LastModificationTime": datetime(2017, 1, 1),
+                    "ForecastArn": "arn:2017-1-1",
+                    "PredictorArn": "arn:2015-1-1",
+                },
+            ]
+        },
+    )
+    forecast_stub.add_response(
+        "describe_forecast",
+        {
+            "ForecastArn": "arn:2017-1-1",
+            "PredictorArn": "arn:2015-1-1",
+            "CreationTime": datetime(2017, 1, 1),
+            "Status": "ACTIVE",
+        },
+    )
+
+    # occupy every export worker - status must not wait on the export pool
+    release = Event()
+    blocked = [_export_executor.submit(release.wait) for _ in range(MAX_WORKERS)]
+    result = {}
+    try:
+        reader = Thread(target=lambda: result.update(status=forecast.status))
+        reader.start()
+        reader.join(timeout=10)
+        assert not reader.is_alive()
+        assert result["status"] == Status.ACTIVE
+    finally:
+        release.set()
+        for future in blocked:
+            future.result()
@@ -34,7 +34,9 @@ from shared.helpers import (
     get_iam_client,
     get_sts_client,
     get_aws_partition,
+    ForecastClient,
 )
+from shared.Forecast.forecast import MAX_WORKERS
 from shared.status import Status
 
 
@@ -137,11 +139,51 @@ def test_client_getters(client, url, monkeypatch):
     assert url in cli.meta.endpoint_url
 
 
+def test_client_config():
+    config = get_forecast_client().meta.config
+    assert config.max_pool_connections >= MAX_WORKERS
+    assert config.retries["mode"] == "adaptive"
+
+
 @mock_sts
 def test_with_account_id():
     assert get_aws_account_id() == "abcdefghijkl"
 
 
+def test_account_id_cached(mocker, monkeypatch):
+    monkeypatch.setattr("shared.helpers._helpers_account_id", None)
+    sts = mocker.MagicMock()
+    sts.get_caller_identity.return_value = {"Account": "abcdefghijkl"}
+    mocker.patch("shared.helpers.get_sts_client", return_value=sts)
+
+    assert get_aws_account_id() == "abcdefghijkl"
+    assert get_aws_account_id() == "abcdefghijkl"
+    sts.get_caller_identity.assert_called_once()
+
+
+@mock_sts
+def test_forecast_client_cli(mocker):
+    client = ForecastClient(
+        resource="dataset_group", Domain="RETAIL", DatasetGroupName="Testing123"
+    )
+    assert client._cli is None
+    assert client.cli is get_forecast_client()
+
+    stub = mocker.MagicMock()
+    client.cli = stub
+    assert client.cli is stub
+
+
+@mock_sts
+def test_forecast_client_paginator():
+    client = ForecastClient(
+        resource="dataset_group", Domain="RETAIL", DatasetGroupName="Testing123"
+    )
+    paginator = client.get_paginator("list_forecasts")
+    assert paginator is client.get_paginator("list_forecasts")
+    assert paginator is not client.get_paginator("list_predictors")
+
+
 def test_input_validator_invalid():
     iv = InputValidator("create_dataset_group")
 